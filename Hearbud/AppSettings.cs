@@ -1,6 +1,7 @@
 using System;
 using System.IO;
 using System.Text.Json;
+using System.Text.Json.Serialization;
 
 namespace Hearbud
 {
@@ -9,11 +10,14 @@ namespace Hearbud
     /// </summary>
     public sealed class AppSettings
     {
+        // Known-folder lookups are shell calls; resolve them once per process.
+        public static string MusicDir { get; } = Environment.GetFolderPath(Environment.SpecialFolder.MyMusic);
+        public static string DefaultOutputDir { get; } = Path.Combine(MusicDir, "Recordings");
+
         public string MicName { get; set; } = "";
         public string SpeakerName { get; set; } = "";
         public string LoopbackName { get; set; } = "Auto (match speaker)";
-        public string OutputDir { get; set; } =
-            Path.Combine(Environment.GetFolderPath(Environment.SpecialFolder.MyMusic), "Recordings");
+        public string OutputDir { get; set; } = DefaultOutputDir;
 
         // Legacy display string kept for backward compat.
         // When loading an old config, this is used to populate Mp3BitrateKbps.
@@ -27,9 +31,13 @@ namespace Hearbud
         public double LoopGain { get; set; } = 1.0;
         public bool IncludeMic { get; set; } = true;
 
-        private static string ConfigPath =>
+        private static readonly string ConfigPath =
             Path.Combine(Environment.GetFolderPath(Environment.SpecialFolder.UserProfile), ".hearbud_config.json");
 
+        // Config file contents as last read or written; Save() skips the disk write when nothing changed.
+        // (A field, so it is never serialized.)
+        private string? _lastJson;
+
         /// <summary>
         /// Loads settings from the configuration file, validating values to ensure they are within safe ranges.
         /// </summary>
@@ -41,10 +49,11 @@ namespace Hearbud
                 if (File.Exists(ConfigPath))
                 {
                     var json = File.ReadAllText(ConfigPath);
-                    var s = JsonSerializer.Deserialize<AppSettings>(json);
+                    var s = JsonSerializer.Deserialize(json, AppSettingsJsonContext.Default.AppSettings);
                     if (s != null)
                     {
                         s.Validate();
+                        s._lastJson = json;
                         return s;
                     }
                 }
@@ -63,11 +72,13 @@ namespace Hearbud
             Mp3BitrateKbps = Mp3BitrateKbps == 0 ? 0 : Math.Clamp(Mp3BitrateKbps, 64, 320);
 
             if (string.IsNullOrWhiteSpace(OutputDir))
-                OutputDir = Path.Combine(Environment.GetFolderPath(Environment.SpecialFolder.MyMusic), "Recordings");
+                OutputDir = DefaultOutputDir;
         }
 
         /// <summary>
-        /// Saves the current settings to the configuration file.
+        /// Saves the current settings to the configuration file. Skips the write if the file already
+        /// holds these settings, and otherwise replaces it atomically so a crash mid-write cannot leave a
+        /// truncated config behind.
         /// </summary>
         public void Save()
         {
@@ -75,10 +86,25 @@ namespace Hearbud
             {
                 // To avoid confusion with legacy configs, we null out the old field.
                 this.Mp3Quality = null;
-                var json = JsonSerializer.Serialize(this, new JsonSerializerOptions { WriteIndented = true });
-                File.WriteAllText(ConfigPath, json);
+                var json = JsonSerializer.Serialize(this, AppSettingsJsonContext.Default.AppSettings);
+                if (json == _lastJson) return;
+
+                var tmp = ConfigPath + ".tmp";
+                File.WriteAllText(tmp, json);
+                File.Move(tmp, ConfigPath, overwrite: true);
+                _lastJson = json;
             }
             catch { /* ignore */ }
         }
     }
+
+    /// <summary>
+    /// Compile-time JSON metadata for <see cref="AppSettings"/>, so loading and saving use generated
+    /// (de)serializers instead of building reflection metadata on first use.
+    /// </summary>
+    [JsonSourceGenerationOptions(WriteIndented = true)]
+    [JsonSerializable(typeof(AppSettings))]
+    internal sealed partial class AppSettingsJsonContext : JsonSerializerContext
+    {
+    }
 }
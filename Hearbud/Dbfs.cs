@@ -16,11 +16,18 @@ namespace Hearbud
             return $"{value:0.00}× ({db:+0.0;-0.0} dB)";
         }
 
+        private const double FloorDb = -60.0;
+        private const double FloorLin = 0.001; // 10^(FloorDb / 20)
+
+        /// <summary>
+        /// Converts a linear peak to dBFS, clamped to a -60 dB floor.
+        /// Levels at or below the floor are compared in the linear domain, so silence (the common
+        /// case while idle) never reaches Math.Log10.
+        /// </summary>
         public static double ToDbfs(double peakLin)
         {
-            if (peakLin <= 1e-6) return -60.0;
-            var d = 20.0 * Math.Log10(peakLin);
-            return Math.Max(-60.0, d);
+            if (peakLin <= FloorLin) return FloorDb;
+            return 20.0 * Math.Log10(peakLin);
         }
     }
 }
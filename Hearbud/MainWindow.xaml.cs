@@ -9,6 +9,7 @@ using System.Reflection;
 using System.Windows;
 using System.Windows.Input;
 using System.Windows.Media;
+using System.Windows.Threading;
 using System.Windows.Controls; // ComboBoxItem
 
 using WpfMessageBox = System.Windows.MessageBox;
@@ -20,12 +21,12 @@ namespace Hearbud
     public partial class MainWindow : Window
     {
     private readonly RecorderEngine _engine = new();
-    private readonly System.Timers.Timer _uiTimer = new(100);
     private TaskbarIcon? _trayIcon;
 
     private AppSettings _settings = AppSettings.Load();
-        private readonly Dictionary<string, MMDevice> _micDict = new();
-        private readonly Dictionary<string, MMDevice> _spkDict = new();
+        // Friendly name → endpoint ID
+        private readonly Dictionary<string, string> _micDict = new();
+        private readonly Dictionary<string, string> _spkDict = new();
 
         private bool _uiReady;
 
@@ -44,9 +45,9 @@ namespace Hearbud
                 // Setup system tray icon
                 SetupTrayIcon();
 
-                Loaded += (_, __) =>
+                Loaded += async (_, __) =>
                 {
-                    SafeRefreshDevices();
+                    await SafeRefreshDevicesAsync();
                     LoadSettingsToUi();
 
                     // default base name
@@ -72,8 +73,11 @@ namespace Hearbud
                 _engine.Status += OnEngineStatus;
                 _engine.EncodingProgress += OnEngineEncodingProgress;
 
-                _uiTimer.Elapsed += (_, __) => Dispatcher.Invoke(UpdateMeters);
-                _uiTimer.Start();
+                _updateMetersAction = UpdateMeters;
+                _clipOnBrush = (System.Windows.Media.Brush)FindResource("ClipBrush");
+                _clipOffBrush = (System.Windows.Media.Brush)FindResource("ControlDisabled");
+                _clipTimer = new DispatcherTimer(DispatcherPriority.Render, Dispatcher);
+                _clipTimer.Tick += (_, _) => { _clipTimer.Stop(); UpdateClipLights(); };
             }
             catch (Exception ex)
             {
@@ -84,48 +88,82 @@ namespace Hearbud
 
         private void OnToggleTheme(object sender, RoutedEventArgs e) { /* hidden; no-op */ }
 
-        private void OnRefreshDevices(object sender, RoutedEventArgs e)
+        private async void OnRefreshDevices(object sender, RoutedEventArgs e)
         {
-            SafeRefreshDevices();
+            await SafeRefreshDevicesAsync();
             TryStartAutoMonitor(); // keep meters alive after device changes
         }
 
-        private void SafeRefreshDevices()
+        // Snapshot of the active endpoints, taken off the UI thread. Only plain strings cross back to
+        // the dispatcher, so no COM device objects outlive the enumeration.
+        private sealed class DeviceSnapshot
         {
+            public List<KeyValuePair<string, string>> Mics { get; } = new();
+            public List<KeyValuePair<string, string>> Speakers { get; } = new();
+            public string? DefaultMic { get; set; }
+            public string? DefaultSpeaker { get; set; }
+        }
+
+        private static DeviceSnapshot EnumerateDevices()
+        {
+            var snap = new DeviceSnapshot();
+            using var enumerator = new MMDeviceEnumerator();
+
+            ReadEndpoints(enumerator, DataFlow.Capture, snap.Mics);
+            ReadEndpoints(enumerator, DataFlow.Render, snap.Speakers);
+
             try
             {
-                _micDict.Clear(); _spkDict.Clear();
+                using var defIn = enumerator.GetDefaultAudioEndpoint(DataFlow.Capture, Role.Communications);
+                snap.DefaultMic = defIn?.FriendlyName;
+            }
+            catch { }
 
-                using var enumerator = new MMDeviceEnumerator();
+            try
+            {
+                using var defOut = enumerator.GetDefaultAudioEndpoint(DataFlow.Render, Role.Multimedia);
+                snap.DefaultSpeaker = defOut?.FriendlyName;
+            }
+            catch { }
 
-                foreach (var dev in enumerator.EnumAudioEndpoints(DataFlow.Capture, DeviceState.Active))
-                    _micDict[dev.FriendlyName] = dev;
+            return snap;
+        }
 
-                foreach (var dev in enumerator.EnumAudioEndpoints(DataFlow.Render, DeviceState.Active))
-                {
-                    _spkDict[dev.FriendlyName] = dev;
-                }
+        private static void ReadEndpoints(MMDeviceEnumerator enumerator, DataFlow flow, List<KeyValuePair<string, string>> into)
+        {
+            using var devices = enumerator.EnumAudioEndpoints(flow, DeviceState.Active);
+            foreach (var dev in devices)
+            {
+                using (dev) into.Add(new KeyValuePair<string, string>(dev.FriendlyName, dev.DeviceID));
+            }
+        }
 
-                MicCombo.ItemsSource = _micDict.Keys.ToList();
-                SpeakerCombo.ItemsSource = _spkDict.Keys.ToList();
+        // Rebinding ItemsSource makes the ComboBox regenerate its item containers, so a refresh that found
+        // the same endpoints in the same order keeps the list it already has.
+        private static void BindDeviceNames(System.Windows.Controls.ComboBox combo, IEnumerable<string> names)
+        {
+            if (combo.ItemsSource is List<string> current && current.SequenceEqual(names)) return;
+            combo.ItemsSource = names.ToList();
+        }
 
-                try
-                {
-                    using var e2 = new MMDeviceEnumerator();
-                    var defIn = e2.GetDefaultAudioEndpoint(DataFlow.Capture, Role.Communications);
-                    if (defIn != null && _micDict.ContainsKey(defIn.FriendlyName))
-                        MicCombo.SelectedItem = defIn.FriendlyName;
-                }
-                catch { }
+        private async Task SafeRefreshDevicesAsync()
+        {
+            try
+            {
+                // Endpoint enumeration is a round-trip to the audio service; keep it off the dispatcher
+                var snap = await Task.Run(EnumerateDevices);
 
-                try
-                {
-                    using var e3 = new MMDeviceEnumerator();
-                    var defOut = e3.GetDefaultAudioEndpoint(DataFlow.Render, Role.Multimedia);
-                    if (defOut != null && _spkDict.ContainsKey(defOut.FriendlyName))
-                        SpeakerCombo.SelectedItem = defOut.FriendlyName;
-                }
-                catch { }
+                _micDict.Clear(); _spkDict.Clear();
+                foreach (var kv in snap.Mics) _micDict[kv.Key] = kv.Value;
+                foreach (var kv in snap.Speakers) _spkDict[kv.Key] = kv.Value;
+
+                BindDeviceNames(MicCombo, _micDict.Keys);
+                BindDeviceNames(SpeakerCombo, _spkDict.Keys);
+
+                if (snap.DefaultMic != null && _micDict.ContainsKey(snap.DefaultMic))
+                    MicCombo.SelectedItem = snap.DefaultMic;
+                if (snap.DefaultSpeaker != null && _spkDict.ContainsKey(snap.DefaultSpeaker))
+                    SpeakerCombo.SelectedItem = snap.DefaultSpeaker;
 
                 if (MicCombo.SelectedItem == null && _micDict.Count > 0)
                     MicCombo.SelectedItem = _micDict.Keys.First();
@@ -154,10 +192,10 @@ namespace Hearbud
 
                 await _engine.MonitorAsync(new RecorderStartOptions
                 {
-                    LoopbackDeviceId = _spkDict[spkName]!.DeviceID,
-                    MicDeviceId = _micDict[micName].DeviceID
+                    LoopbackDeviceId = _spkDict[spkName],
+                    MicDeviceId = _micDict[micName]
                 });
-                StatusText.Text = "Monitoring...";
+                if (DateTime.Now >= _statusHoldUntil) StatusText.Text = "Monitoring...";
             });
         }
 
@@ -170,7 +208,7 @@ namespace Hearbud
             catch (CoreAudioAPIException ex) when (ex.HResult == unchecked((int)0x88890004))
             {
                 StatusText.Text = "Refreshing devices...";
-                SafeRefreshDevices();
+                await SafeRefreshDevicesAsync();
                 try
                 {
                     await action();
@@ -194,7 +232,7 @@ namespace Hearbud
                 {
                     InitialDirectory = Directory.Exists(OutputFolderText.Text)
                         ? OutputFolderText.Text
-                        : Environment.GetFolderPath(Environment.SpecialFolder.MyMusic),
+                        : AppSettings.MusicDir,
                     ShowNewFolderButton = true
                 };
                 if (dlg.ShowDialog() == System.Windows.Forms.DialogResult.OK)
@@ -215,7 +253,7 @@ namespace Hearbud
                 var outDir = OutputFolderText.Text;
                 if (string.IsNullOrWhiteSpace(outDir) || !Directory.Exists(outDir))
                 {
-                    var def = Path.Combine(Environment.GetFolderPath(Environment.SpecialFolder.MyMusic), "Recordings");
+                    var def = AppSettings.DefaultOutputDir;
                     Directory.CreateDirectory(def);
                     OutputFolderText.Text = def;
                     outDir = def;
@@ -257,21 +295,18 @@ namespace Hearbud
                     return;
                 }
 
-                MMDevice? loopDevice = _spkDict[spkName];
-
                 _engine.MicGain = MicGain.Value;   // meters & mix balance
                 _engine.LoopGain = LoopGain.Value; // meters & mix balance
 
                 await _engine.StartAsync(new RecorderStartOptions
                 {
                     OutputPath = Path.Combine(outDir, baseName),
-                    LoopbackDeviceId = loopDevice!.DeviceID,
-                    MicDeviceId = _micDict[micName].DeviceID,
+                    LoopbackDeviceId = _spkDict[spkName],
+                    MicDeviceId = _micDict[micName],
                     Mp3BitrateKbps = GetSelectedBitrateKbps()
                 });
 
-                StartBtn.IsEnabled = false;
-                StopBtn.IsEnabled  = true;
+                SetRecordingControls(true);
                 StatusText.Text = "Recording...";
             }
             catch (Exception ex)
@@ -285,16 +320,24 @@ namespace Hearbud
             StopBtn.IsEnabled = false;
             try 
             {
-                await _engine.StopAsync(); 
+                _stopTask = _engine.StopAsync();
+                await _stopTask; 
             }
             catch (Exception ex) 
             { 
                 CrashLog.LogAndShow("OnStop", ex);
-                StartBtn.IsEnabled = true;
-                StopBtn.IsEnabled = false;
+                SetRecordingControls(false);
             }
         }
 
+        // Start/Stop enable state in one place; IsEnabled is a dependency property, so re-setting the
+        // current value raises no change notification
+        private void SetRecordingControls(bool recording)
+        {
+            StartBtn.IsEnabled = !recording;
+            StopBtn.IsEnabled  = recording;
+        }
+
         private static string SanitizeFilename(string name)
         {
             var invalid = Path.GetInvalidFileNameChars();
@@ -305,9 +348,18 @@ namespace Hearbud
         private void OnGainChanged(object sender, RoutedPropertyChangedEventArgs<double> e)
         {
             if (!_uiReady) return;
-            UpdateGainLabels();
-            _engine.MicGain = MicGain.Value;
-            _engine.LoopGain = LoopGain.Value;
+
+            // Only the dragged slider changed; leave the other label and engine gain alone
+            if (ReferenceEquals(sender, MicGain))
+            {
+                MicGainLabel.Text = Dbfs.FormatGain(e.NewValue);
+                _engine.MicGain = e.NewValue;
+            }
+            else
+            {
+                LoopGainLabel.Text = Dbfs.FormatGain(e.NewValue);
+                _engine.LoopGain = e.NewValue;
+            }
         }
 
         private void UpdateGainLabels()
@@ -317,52 +369,141 @@ namespace Hearbud
             LoopGainLabel.Text = Dbfs.FormatGain(LoopGain.Value);
         }
 
-        private volatile float _micPeak;
-        private volatile float _sysPeak;
+        // Peak-of-peaks since the last meter refresh; capture threads raise it, UpdateMeters takes it and
+        // resets it to -1. -1 also means "nothing reported", so a refresh only touches meters that had events.
+        private float _micPeak = -1f;
+        private float _sysPeak = -1f;
+        // Last dBFS value written to each label (0.1 dB steps), so unchanged readings skip the string format
+        private double _micDbShown = double.NaN;
+        private double _sysDbShown = double.NaN;
         private DateTime _micClipUntil = DateTime.MinValue;
         private DateTime _sysClipUntil = DateTime.MinValue;
+        // Clip indicator brushes, resolved once; the lit flags let a refresh skip an unchanged Foreground
+        private readonly System.Windows.Media.Brush _clipOnBrush = null!;
+        private readonly System.Windows.Media.Brush _clipOffBrush = null!;
+        private bool _micClipLit;
+        private bool _sysClipLit;
+        // Level events stop with the captures, so a lit CLIP label is put out by this one-shot timer
+        private readonly DispatcherTimer _clipTimer = null!;
+
+        // Meters are pushed from the engine's level events instead of polled by a timer. At most one
+        // refresh is queued on the dispatcher at a time; later events just update the fields it reads.
+        private readonly Action _updateMetersAction;
+        private int _meterUpdatePending;
 
         private void OnEngineLevelChanged(object? sender, LevelChangedEventArgs e)
         {
-            if (e.Source == LevelSource.Mic) _micPeak = e.Peak;
-            else _sysPeak = e.Peak;
+            if (e.Source == LevelSource.Mic) RaisePeak(ref _micPeak, e.Peak);
+            else RaisePeak(ref _sysPeak, e.Peak);
 
             if (e.Clipped)
             {
                 if (e.Source == LevelSource.Mic) _micClipUntil = DateTime.Now.AddMilliseconds(1500);
                 else _sysClipUntil = DateTime.Now.AddMilliseconds(1500);
             }
+
+            if (Interlocked.Exchange(ref _meterUpdatePending, 1) == 0)
+                Dispatcher.BeginInvoke(DispatcherPriority.Render, _updateMetersAction);
         }
 
         private void UpdateMeters()
         {
-            var mp = Math.Clamp(_micPeak, 0f, 1f);
-            var sp = Math.Clamp(_sysPeak, 0f, 1f);
+            Volatile.Write(ref _meterUpdatePending, 0);
+
+            var micPeak = Interlocked.Exchange(ref _micPeak, -1f);
+            if (micPeak >= 0f) ShowMeter(MicBar, MicDb, micPeak, ref _micDbShown);
+
+            var sysPeak = Interlocked.Exchange(ref _sysPeak, -1f);
+            if (sysPeak >= 0f) ShowMeter(SysBar, SysDb, sysPeak, ref _sysDbShown);
+
+            UpdateClipLights();
+        }
+
+        private void UpdateClipLights()
+        {
+            var now = DateTime.Now;
+            ShowClip(MicClip, now < _micClipUntil, ref _micClipLit);
+            ShowClip(SysClip, now < _sysClipUntil, ref _sysClipLit);
+
+            if (!_clipTimer.IsEnabled && (_micClipLit || _sysClipLit))
+            {
+                // Wake at the first expiry; the tick re-arms if the other light (or a new clip) is still on
+                var until = !_micClipLit ? _sysClipUntil
+                          : !_sysClipLit ? _micClipUntil
+                          : (_micClipUntil < _sysClipUntil ? _micClipUntil : _sysClipUntil);
+                var wait = until - now;
+                _clipTimer.Interval = wait > TimeSpan.FromMilliseconds(1) ? wait : TimeSpan.FromMilliseconds(1);
+                _clipTimer.Start();
+            }
+        }
+
+        // Blank both meters and put out the clip lights once captures have stopped
+        private void ResetMeters()
+        {
+            Interlocked.Exchange(ref _micPeak, -1f);
+            Interlocked.Exchange(ref _sysPeak, -1f);
+            MicBar.Value = SysBar.Value = 0;
+            MicDb.Text = SysDb.Text = "";
+            _micDbShown = _sysDbShown = double.NaN;
+
+            _micClipUntil = _sysClipUntil = DateTime.MinValue;
+            _clipTimer.Stop();
+            UpdateClipLights();
+        }
 
-            MicBar.Value = Math.Round(mp * 100, 1);
-            SysBar.Value = Math.Round(sp * 100, 1);
+        private void ShowClip(System.Windows.Controls.TextBlock label, bool lit, ref bool shownLit)
+        {
+            if (lit == shownLit) return;
+            shownLit = lit;
+            label.Foreground = lit ? _clipOnBrush : _clipOffBrush;
+        }
 
-            MicDb.Text = $"{Dbfs.ToDbfs(mp),6:0.0} dBFS";
-            SysDb.Text = $"{Dbfs.ToDbfs(sp),6:0.0} dBFS";
+        private static void RaisePeak(ref float slot, float peak)
+        {
+            float cur;
+            do
+            {
+                cur = Volatile.Read(ref slot);
+                if (peak <= cur) return;
+            }
+            while (Interlocked.CompareExchange(ref slot, peak, cur) != cur);
+        }
 
-            MicClip.Foreground = DateTime.Now < _micClipUntil ? (System.Windows.Media.Brush)FindResource("ClipBrush") : (System.Windows.Media.Brush)FindResource("ControlDisabled");
-            SysClip.Foreground = DateTime.Now < _sysClipUntil ? (System.Windows.Media.Brush)FindResource("ClipBrush") : (System.Windows.Media.Brush)FindResource("ControlDisabled");
+        private static void ShowMeter(System.Windows.Controls.ProgressBar bar, System.Windows.Controls.TextBlock label, float peak, ref double shownDb)
+        {
+            var p = Math.Clamp(peak, 0f, 1f);
+            double pct = Math.Round(p * 100, 1);
+            if (bar.Value != pct) bar.Value = pct;
+
+            double db = Math.Round(Dbfs.ToDbfs(p), 1);
+            if (db == shownDb) return;
+            shownDb = db;
+            label.Text = $"{db,6:0.0} dBFS";
         }
 
         private void OnEngineEncodingProgress(object? sender, int percent)
         {
-            Dispatcher.Invoke(() =>
+            // BeginInvoke so the encoder thread never waits on the UI to repaint
+            Dispatcher.BeginInvoke(() =>
             {
                 EncodingProgressBar.Value = percent;
                 EncodingProgressText.Text = $"{percent}%";
             });
         }
 
+        // How long a save notice stays up before background status lines may replace it
+        private const int StatusHoldMs = 3000;
+        private DateTime _statusHoldUntil = DateTime.MinValue;
+
         private void OnEngineStatus(object? sender, EngineStatusEventArgs e)
         {
-            Dispatcher.Invoke(() =>
+            // BeginInvoke so a capture thread reporting an error (or StopAsync reporting completion) never
+            // blocks on the UI, including while a message box is open; same-priority posts keep their order
+            Dispatcher.BeginInvoke(() =>
             {
-                StatusText.Text = e.Message;
+                // Routine Info lines (e.g. "Monitoring…" after a stop) don't replace the save notice right away
+                if (e.Kind != EngineStatusKind.Info || DateTime.Now >= _statusHoldUntil)
+                    StatusText.Text = e.Message;
 
                 if (e.Kind == EngineStatusKind.Encoding)
                 {
@@ -376,18 +517,17 @@ namespace Hearbud
                     EncodingProgressBar.Visibility = Visibility.Collapsed;
                     EncodingProgressText.Visibility = Visibility.Collapsed;
 
-                    StartBtn.IsEnabled = true;
-                    StopBtn.IsEnabled = false;
+                    SetRecordingControls(false);
+                    ResetMeters();
 
-                    WpfMessageBox.Show(
-                        $"Saved files to:\n{Path.GetDirectoryName(e.OutputPathSystem)}",
-                        "Files saved",
-                        MessageBoxButton.OK, MessageBoxImage.Information);
+                    // Inline notice instead of a modal box; the output folder is opened below anyway
+                    string? directoryPath = Path.GetDirectoryName(e.OutputPathSystem);
+                    StatusText.Text = e.Success ? $"Saved to {directoryPath}" : e.Message;
+                    _statusHoldUntil = DateTime.Now.AddMilliseconds(StatusHoldMs);
 
                     // Open the output folder
                     try
                     {
-                        string? directoryPath = Path.GetDirectoryName(e.OutputPathSystem);
                         if (!string.IsNullOrEmpty(directoryPath) && Directory.Exists(directoryPath))
                         {
                             Process.Start(new ProcessStartInfo()
@@ -401,11 +541,12 @@ namespace Hearbud
                     catch (Exception ex) { CrashLog.LogAndShow("OpenOutputFolder", ex); }
 
 
-                    // Keep monitoring so meters remain live after stop
-                    TryStartAutoMonitor();
+                    // Keep monitoring so meters remain live after stop (unless the stop was for closing)
+                    if (!_closingAfterStop) TryStartAutoMonitor();
                 }
                 else if (e.Kind == EngineStatusKind.Error)
                 {
+                    ResetMeters();
                     WpfMessageBox.Show(e.Message, "Recording Error",
                         MessageBoxButton.OK, MessageBoxImage.Error);
                 }
@@ -466,13 +607,28 @@ namespace Hearbud
             base.OnStateChanged(e);
         }
 
+        // The last StopAsync started by Stop or by closing; the window stays open until it has finished
+        private Task? _stopTask;
+        // Set once closing had to wait for a stop first; _stoppedForClose then lets the re-issued close through
+        private bool _closingAfterStop;
+        private bool _stoppedForClose;
+
         /// <summary>
         /// Handles the window closing event. If a recording is in progress, 
         /// prompts the user for confirmation to prevent accidental data loss.
+        /// A stop that is still flushing or encoding is waited for before the window closes.
         /// </summary>
         protected override async void OnClosing(CancelEventArgs e)
         {
             base.OnClosing(e);
+            if (_stoppedForClose) return;
+
+            // A second close request while the stop below is still flushing is ignored
+            if (_closingAfterStop)
+            {
+                e.Cancel = true;
+                return;
+            }
 
             if (_engine.IsRecording)
             {
@@ -488,15 +644,28 @@ namespace Hearbud
                     return;
                 }
 
-                // Ensure the engine stops and flushes before the window fully closes
-                await _engine.StopAsync();
+                _stopTask = _engine.StopAsync();
+            }
+
+            // The close is cancelled here and re-issued once StopAsync has flushed, finalized and encoded
+            // the files, whether the stop came from above or from an earlier Stop click (IsRecording is
+            // already false while it encodes); an async void handler returning at its first await would
+            // otherwise let OnClosed dispose the engine under the running stop
+            var stop = _stopTask;
+            if (stop != null && !stop.IsCompleted)
+            {
+                e.Cancel = true;
+                _closingAfterStop = true;
+                try { await stop; }
+                catch (Exception ex) { CrashLog.LogAndShow("OnClosing", ex); }
+                _stoppedForClose = true;
+                Close();
             }
         }
 
         protected override void OnClosed(EventArgs e)
         {
             base.OnClosed(e);
-            try { _uiTimer.Stop(); } catch { }
             try { _trayIcon?.Dispose(); } catch { }
             try
             {
@@ -521,7 +690,7 @@ namespace Hearbud
                     OutputFolderText.Text = _settings.OutputDir;
                 else
                 {
-                    var def = Path.Combine(Environment.GetFolderPath(Environment.SpecialFolder.MyMusic), "Recordings");
+                    var def = AppSettings.DefaultOutputDir;
                     Directory.CreateDirectory(def);
                     OutputFolderText.Text = def;
                 }
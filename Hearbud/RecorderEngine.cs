@@ -10,14 +10,16 @@
 // If "Original" quality is selected, it skips the MP3 step.
 //
 // OPTIMIZATIONS (PERFORMANCE FIXES)
-// - ASYNC I/O: Writing to disk is now decoupled from the audio callback using a BlockingCollection queue.
+// - ASYNC I/O: Writing to disk is now decoupled from the audio callback using a lock-free Channel queue.
 //   This prevents disk latency (IO blocks) from stalling the sensitive audio threads.
 //   The queue capacity is dynamically calculated to provide ~10s of buffer, adapting to the format.
 // - BUFFER POOLING: We use ArrayPool<byte> to pass data to the writer thread. This avoids allocating
 //   new byte[] objects 100 times a second, reducing Garbage Collector (GC) pressure significantly.
 //   FIX: EnqueueWrite now uses try/finally to ensure rented buffers are returned even if adding fails.
-// - ZERO-ALLOC RESAMPLING: The resampling logic now reuses a scratch buffer instead of allocating
-//   temp arrays on every frame.
+//   Callbacks convert straight into the rented buffer (TryRentWriteBuffer), so blocks are not staged
+//   in a private PCM buffer and then copied again.
+// - ZERO-ALLOC RESAMPLING: Resampling and channel remapping are done in one pass straight into the
+//   destination buffer, so no temp/scratch array is needed on any frame.
 // - STOP TIMEOUT: StopAsync now includes a 30s timeout when draining the write queue to prevent
 //   indefinite hangs if disk I/O stalls or the writer thread deadlocks.
 // - ASYNC DEVICE INIT: OpenDevicesAsync now uses Task.Delay instead of Thread.Sleep. This prevents
@@ -25,6 +27,9 @@
 // - CANCELLATION SUPPORT: StopAsync now accepts a CancellationToken to allow aborting 
 //   the MP3 encoding process if it takes too long.
 // - LOG LIMITING: The log file is now capped at 10MB to prevent unbounded growth during long sessions.
+// - CAPTURE PRIORITY: Each WASAPI capture thread raises itself to Highest and joins the MMCSS "Pro Audio"
+//   task on its first callback, so UI and encoder load cannot delay the callbacks long enough to overrun
+//   the device buffer.
 //
 // DESIGN INTENT
 // - Loopback (system) is the "clock source": whenever loopback provides a chunk, we pull a same-sized
@@ -38,11 +43,12 @@
 
 using System;
 using System.Buffers; // Added: For ArrayPool (Memory Optimization)
-using System.Collections.Concurrent; // Added: For BlockingCollection (Async I/O)
+using System.Threading.Channels; // Added: For the lock-free write queue (Async I/O)
 using System.Diagnostics;
 using System.IO;
 using System.Numerics;
 using System.Runtime.CompilerServices;
+using System.Runtime.InteropServices;
 using System.Threading; 
 using System.Threading.Tasks; 
 using CSCore;
@@ -126,6 +132,9 @@ namespace Hearbud
         private const int BlockFrames = 1024;
         private const int DefaultQueueCapacity = 2000;
         private const int MaxQueueCapacity = 10000;
+        // Each queued block is only a few KB, below FileStream's default 4 KB threshold for going straight
+        // to the OS. A larger buffer coalesces ~20-60 blocks into one WriteFile call per file.
+        private const int DiskWriteBufferBytes = 256 * 1024;
 
         private double _micGain = 1.0;
         private double _loopGain = 1.0;
@@ -175,10 +184,15 @@ namespace Hearbud
         private WaveWriter? _wavSys;
         private WaveWriter? _wavMic;
         private WaveWriter? _wavMix;
+        private FileStream? _fsSys;
+        private FileStream? _fsMic;
+        private FileStream? _fsMix;
         private readonly bool _mixUse32Bit = true; 
 
         // Async Write Queue
-        private BlockingCollection<AudioWriteJob>? _writeQueue;
+        private Channel<AudioWriteJob>? _writeQueue;
+        private int _writeQueueDepth;
+        private int _writeQueueCapacity;
         private Task? _writeTask;
         private long _droppedBlocks = 0;
         private Exception? _writerException;
@@ -191,6 +205,10 @@ namespace Hearbud
 
         private string _logPath = "";
         private StreamWriter? _log;
+        // Log lines are formatted by the caller and written by LogWriteLoop, so Info/Warn from the audio
+        // callbacks never wait on a synchronous file write
+        private Channel<string>? _logQueue;
+        private Task? _logTask;
         private const long MaxLogSizeBytes = 10 * 1024 * 1024; // 10 MB
         private long _logBytesWritten = 0;
 
@@ -200,14 +218,21 @@ namespace Hearbud
         private float[] _micConvBuf   = new float[BlockFrames * 8];
         private float[] _tmpMicBlock  = new float[BlockFrames * 8];
         private float[] _mixBufF      = new float[BlockFrames * 8];
-        
-        // Reusable scratch buffer for the resampler (Performance Fix)
-        private float[] _resampleScratch = new float[BlockFrames * 8];
 
-        private byte[]  _pcm16Sys     = new byte[BlockFrames * 8 * 2];
-        private byte[]  _pcm16Mic     = new byte[BlockFrames * 8 * 2];
-        private byte[]  _pcm16Mix     = new byte[BlockFrames * 8 * 2];
-        private byte[]  _pcm32Mix     = new byte[BlockFrames * 8 * 4];
+        // Mic resampler state carried across callbacks (see ConvertToTarget)
+        private double  _micResamplePos;
+        private float[] _micResamplePrev = new float[8];
+        private bool    _micResampleHasPrev;
+
+        // Capture formats are fixed once a device is initialized; cached at open so the callbacks don't
+        // walk the SoundInSource / sample-source WaveFormat property chains on every block
+        private int _loopBlockAlign;
+        private int _micBlockAlign;
+        private CSCore.WaveFormat? _micSrcFormat;
+
+        // True when the mic already delivers the output rate/channel layout (decided once at open),
+        // so callbacks read straight into _micConvBuf and skip ConvertToTarget entirely
+        private bool    _micPassthrough;
 
         private readonly object _micRingLock = new();
         private readonly object _logLock = new();
@@ -221,12 +246,25 @@ namespace Hearbud
         private string _loopDevName = "";
         private string _micDevName  = "(none)";
         private long _micUnderrunBlocks = 0;
+        private long _micOverrunBlocks = 0;
         private long _loopBlockCounter = 0;
         private double _lastMicBacklogSec = 0.0;
         private double _micBacklogSecMax = 0.0;
         private const int BacklogLogEveryNBlocks = 50;
 
+        // Upper bound on buffered mic audio waiting to be mixed. If the mic clock runs ahead of the
+        // loopback clock and the backlog passes the cap, the oldest samples are dropped down to the
+        // target (a healthy steady-state backlog), so the mix does not keep a fixed offset afterwards.
+        private const double MaxMicBacklogSec = 0.5;
+        private const double MicBacklogTargetSec = 0.05;
+        private int _micMaxBacklogSamples = 48000; // 0.5 s of 48 kHz stereo until a device is opened
+        private int _micBacklogTargetSamples = 4800;
+
         private const double LevelThrottleMs = 50.0; 
+
+        // Below this level tanh(x) rounds to x in single precision (x³/3 is under half an ulp of x),
+        // so the soft clip can be skipped for near-silent blocks without changing any output sample.
+        private const float SoftClipLinearBelow = 1f / 4096f;
         private long _lastLevelTickMic = 0;
         private long _lastLevelTickSys = 0;
         private float _peakSinceLastMic = 0f;
@@ -277,7 +315,7 @@ namespace Hearbud
             _kbps = opts.Mp3BitrateKbps;
 
             var basePath = string.IsNullOrWhiteSpace(opts.OutputPath)
-                ? Path.Combine(Environment.GetFolderPath(Environment.SpecialFolder.MyMusic), "Recordings", $"rec-{DateTime.Now:yyyyMMdd_HHmmss}")
+                ? Path.Combine(AppSettings.DefaultOutputDir, $"rec-{DateTime.Now:yyyyMMdd_HHmmss}")
                 : opts.OutputPath;
 
             var outDir = Path.GetDirectoryName(basePath)!;
@@ -299,18 +337,23 @@ namespace Hearbud
             Info($"Output Mix:    {_pathMix}");
 
             // Create writers
-            _wavSys = new WaveWriter(_pathSys, new CSCore.WaveFormat(_outRate, 16, _outChannels));
-            _wavMic = new WaveWriter(_pathMic, new CSCore.WaveFormat(_outRate, 16, _outChannels));
-            _wavMix = new WaveWriter(_pathMix, new CSCore.WaveFormat(_outRate, _mixUse32Bit ? 32 : 16, _outChannels));
+            _wavSys = CreateWaveWriter(_pathSys, new CSCore.WaveFormat(_outRate, 16, _outChannels), out _fsSys);
+            _wavMic = CreateWaveWriter(_pathMic, new CSCore.WaveFormat(_outRate, 16, _outChannels), out _fsMic);
+            _wavMix = CreateWaveWriter(_pathMix, new CSCore.WaveFormat(_outRate, _mixUse32Bit ? 32 : 16, _outChannels), out _fsMix);
 
             // Initialize Async Write Queue and Task
             // Capacity is set to handle ~10 seconds of buffering if disk stalls completely.
-            _writeQueue = new BlockingCollection<AudioWriteJob>(
-                Math.Clamp(CalculateOptimalQueueSize(), DefaultQueueCapacity, MaxQueueCapacity)); 
-            _writeTask = Task.Factory.StartNew(DiskWriteLoop, TaskCreationOptions.LongRunning);
+            // The channel itself is unbounded (its lock-free single-reader mode); the capacity is enforced
+            // by EnqueueWrite with an interlocked depth counter so a full queue drops instead of blocking.
+            _writeQueueCapacity = Math.Clamp(CalculateOptimalQueueSize(), DefaultQueueCapacity, MaxQueueCapacity);
+            _writeQueueDepth = 0;
+            _writeQueue = Channel.CreateUnbounded<AudioWriteJob>(
+                new UnboundedChannelOptions { SingleReader = true, SingleWriter = false });
+            _writeTask = Task.Run(DiskWriteLoop);
 
             lock (_micRingLock) { _micR = _micW = _micCount = 0; }
             _micUnderrunBlocks = 0;
+            _micOverrunBlocks = 0;
             _loopBlockCounter = 0;
             _lastMicBacklogSec = 0.0;
             _micBacklogSecMax = 0.0;
@@ -334,7 +377,7 @@ namespace Hearbud
             if (_writeQueue != null && _writeTask != null)
             {
                 Info("Finishing background writes...");
-                _writeQueue.CompleteAdding();
+                _writeQueue.Writer.TryComplete();
 
                 // Wait for background writes to finish, but with a timeout to prevent hanging
                 // if disk I/O stalls or the writer thread deadlocks.
@@ -348,7 +391,6 @@ namespace Hearbud
                     Warn("Write queue drain timed out after 30s");
                 }
 
-                _writeQueue.Dispose();
                 _writeQueue = null;
             }
 
@@ -360,10 +402,9 @@ namespace Hearbud
 
             // 2. Now it is safe to close the files (WAV headers are updated on Dispose)
             bool okSys = false, okMic = false, okMix = false, okMp3 = false;
-            try { _wavSys?.Dispose(); okSys = File.Exists(_pathSys) && new FileInfo(_pathSys).Length > 0; } catch { }
-            try { _wavMic?.Dispose(); okMic = File.Exists(_pathMic) && new FileInfo(_pathMic).Length > 0; } catch { }
-            try { _wavMix?.Dispose(); okMix = File.Exists(_pathMix) && new FileInfo(_pathMix).Length > 0; } catch { }
-            _wavSys = null; _wavMic = null; _wavMix = null;
+            try { CloseWaveWriter(ref _wavSys, ref _fsSys); okSys = IsNonEmptyFile(_pathSys); } catch { }
+            try { CloseWaveWriter(ref _wavMic, ref _fsMic); okMic = IsNonEmptyFile(_pathMic); } catch { }
+            try { CloseWaveWriter(ref _wavMix, ref _fsMix); okMix = IsNonEmptyFile(_pathMix); } catch { }
             
             bool doMp3Encoding = _kbps > 0;
             Exception? encEx = null;
@@ -373,7 +414,7 @@ namespace Hearbud
             {
                 RaiseStatus(EngineStatusKind.Encoding, "Encoding MP3…");
 
-                if (okMix && File.Exists(_pathMix))
+                if (okMix)
                 {
                     await Task.Run(() =>
                     {
@@ -402,6 +443,7 @@ namespace Hearbud
                                 long bytesProcessed = 0;
                                 byte[] buf = new byte[1 << 16]; 
                                 int read;
+                                int lastPercent = -1;
 
                                 while ((read = source.Read(buf, 0, buf.Length)) > 0)
                                 {
@@ -411,7 +453,12 @@ namespace Hearbud
                                     if (totalBytes > 0)
                                     {
                                         int percent = Math.Min(100, (int)((double)bytesProcessed * 100 / (totalBytes / (reader.WaveFormat.BitsPerSample / 16))));
-                                        EncodingProgress?.Invoke(this, percent);
+                                        // One event per whole percent (~100 per encode) rather than one per 64 KB chunk
+                                        if (percent != lastPercent)
+                                        {
+                                            lastPercent = percent;
+                                            EncodingProgress?.Invoke(this, percent);
+                                        }
                                     }
                                 }
                             }
@@ -420,7 +467,7 @@ namespace Hearbud
                                 if (sourceNeedsDispose && source is IDisposable d) d.Dispose();
                             }
 
-                            okMp3 = File.Exists(_pathMp3) && new FileInfo(_pathMp3).Length > 0;
+                            okMp3 = IsNonEmptyFile(_pathMp3);
                             Info($"MP3 encode ok={okMp3}");
                         }
                         catch (Exception ex)
@@ -441,7 +488,7 @@ namespace Hearbud
                 _pathMp3 = "";
             }
 
-            Info($"Mic ring underruns: {_micUnderrunBlocks}. Peak mic backlog: {_micBacklogSecMax:F4}s");
+            Info($"Mic ring underruns: {_micUnderrunBlocks}, overruns: {_micOverrunBlocks}. Peak mic backlog: {_micBacklogSecMax:F4}s");
             if (_droppedBlocks > 0)
             {
                 Warn($"Dropped {_droppedBlocks} audio blocks due to disk I/O stall");
@@ -449,7 +496,7 @@ namespace Hearbud
             Info("Recording stopped");
             Info("===== Session end =====");
 
-            TryDispose(ref _log);
+            CloseLog();
             _logPath = ""; 
 
             bool anyOk = okSys || okMic || okMix || okMp3;
@@ -469,62 +516,67 @@ namespace Hearbud
             if (_disposed) return;
             _disposed = true;
 
-            try { _wavSys?.Dispose(); } catch { }
-            try { _wavMic?.Dispose(); } catch { }
-            try { _wavMix?.Dispose(); } catch { }
-            _wavSys = null; _wavMic = null; _wavMix = null;
+            // Shut down in data-flow order: stop the captures so nothing new is queued, let the writer
+            // drain what is already queued, and only then close the WAV writers it writes to.
+            StopInternal(fullStop: true);
 
             // Stop the write queue if it's still running. 
-            // We check IsAddingCompleted to avoid InvalidOperationException if StopAsync was already called.
+            // TryComplete is a no-op if StopAsync already completed the channel.
             try
             {
-                if (_writeQueue != null && !_writeQueue.IsAddingCompleted)
-                {
-                    _writeQueue.CompleteAdding();
-                }
+                _writeQueue?.Writer.TryComplete();
                 _writeTask?.Wait(1000);
             }
             catch { }
-            try { _writeQueue?.Dispose(); } catch { }
+            _writeQueue = null;
 
-            StopInternal(fullStop: true);
-            TryDispose(ref _log);
+            CloseWaveWriter(ref _wavSys, ref _fsSys);
+            CloseWaveWriter(ref _wavMic, ref _fsMic);
+            CloseWaveWriter(ref _wavMix, ref _fsMix);
+
+            CloseLog();
         }
 
         // ==========================================
         // BACKGROUND WRITE LOOP
         // ==========================================
-        // This runs on a separate thread. It pulls data chunks from the queue and writes them to disk.
+        // This runs on a thread-pool task. It pulls data chunks from the queue and writes them to disk.
         // This ensures that slow disk I/O never blocks the audio callback methods.
-        private void DiskWriteLoop()
+        private async Task DiskWriteLoop()
         {
-            if (_writeQueue == null) return;
+            var reader = _writeQueue?.Reader;
+            if (reader == null) return;
 
             try
             {
-                // GetConsumingEnumerable blocks until an item is available or CompleteAdding is called.
-                foreach (var job in _writeQueue.GetConsumingEnumerable())
+                // WaitToReadAsync completes when an item is available, or returns false once the writer
+                // is completed and the queue is drained.
+                while (await reader.WaitToReadAsync().ConfigureAwait(false))
                 {
-                    try
+                    while (reader.TryRead(out var job))
                     {
-                        switch (job.Target)
+                        Interlocked.Decrement(ref _writeQueueDepth);
+                        try
                         {
-                            case AudioFileTarget.System: _wavSys?.Write(job.Data, 0, job.Count); break;
-                            case AudioFileTarget.Mic:    _wavMic?.Write(job.Data, 0, job.Count); break;
-                            case AudioFileTarget.Mix:    _wavMix?.Write(job.Data, 0, job.Count); break;
+                            switch (job.Target)
+                            {
+                                case AudioFileTarget.System: _wavSys?.Write(job.Data, 0, job.Count); break;
+                                case AudioFileTarget.Mic:    _wavMic?.Write(job.Data, 0, job.Count); break;
+                                case AudioFileTarget.Mix:    _wavMix?.Write(job.Data, 0, job.Count); break;
+                            }
+                        }
+                        catch (Exception ex)
+                        {
+                            // We swallow write errors here to keep the thread alive for other files, 
+                            // but strictly we should log this.
+                            Debug.WriteLine($"Disk write error: {ex.Message}");
+                        }
+                        finally
+                        {
+                            // IMPORTANT: Return the rented buffer to the pool so it can be reused.
+                            // This creates a "Zero Allocation" loop for buffer memory.
+                            ArrayPool<byte>.Shared.Return(job.Data);
                         }
-                    }
-                    catch (Exception ex)
-                    {
-                        // We swallow write errors here to keep the thread alive for other files, 
-                        // but strictly we should log this.
-                        Debug.WriteLine($"Disk write error: {ex.Message}");
-                    }
-                    finally
-                    {
-                        // IMPORTANT: Return the rented buffer to the pool so it can be reused.
-                        // This creates a "Zero Allocation" loop for buffer memory.
-                        ArrayPool<byte>.Shared.Return(job.Data);
                     }
                 }
             }
@@ -537,30 +589,37 @@ namespace Hearbud
             }
         }
 
+        private static WaveWriter CreateWaveWriter(string path, CSCore.WaveFormat format, out FileStream stream)
+        {
+            stream = new FileStream(path, FileMode.Create, FileAccess.Write, FileShare.Read, DiskWriteBufferBytes);
+            return new WaveWriter(stream, format);
+        }
+
+        // The writer finalizes the RIFF header on Dispose; the stream is closed afterwards so the
+        // buffered tail and the header rewrite are flushed together.
+        private static void CloseWaveWriter(ref WaveWriter? writer, ref FileStream? stream)
+        {
+            TryDispose(ref writer);
+            TryDispose(ref stream);
+        }
+
         private int CalculateOptimalQueueSize()
         {
             // Based on sample rate and block size, calculate ~10 seconds of buffer
             return Math.Max(DefaultQueueCapacity, (_outRate * _outChannels * 10) / (BlockFrames * _outChannels));
         }
 
-        private void EnqueueWrite(AudioFileTarget target, byte[] sourceData, int count)
+        // Reserves a slot in the write queue and rents a pooled buffer of at least 'count' bytes for the
+        // caller to fill in place. Returns false if not recording, or if the queue is full (only that case
+        // counts a dropped block). A successful rent must be followed by EnqueueWrite with the same buffer.
+        private bool TryRentWriteBuffer(int count, out byte[] buffer)
         {
-            if (!_recording || _writeQueue == null || _writeQueue.IsAddingCompleted) return;
+            buffer = Array.Empty<byte>();
+            if (!_recording || _writeQueue == null) return false;
 
-            byte[] rented = ArrayPool<byte>.Shared.Rent(count);
-            bool added = false;
-            try
-            {
-                Array.Copy(sourceData, 0, rented, 0, count);
-                added = _writeQueue.TryAdd(new AudioWriteJob(target, rented, count));
-            }
-            finally
-            {
-                if (!added) ArrayPool<byte>.Shared.Return(rented);
-            }
-
-            if (!added)
+            if (Interlocked.Increment(ref _writeQueueDepth) > _writeQueueCapacity)
             {
+                Interlocked.Decrement(ref _writeQueueDepth);
                 long dropped = Interlocked.Increment(ref _droppedBlocks);
                 // Log the first drop immediately, then every 100th drop to avoid log spam.
                 // The first drop is a critical indicator of disk I/O bottlenecks.
@@ -568,6 +627,29 @@ namespace Hearbud
                 {
                     Warn($"Write queue full, dropped {dropped} block(s) - disk I/O bottleneck!");
                 }
+                return false;
+            }
+
+            buffer = ArrayPool<byte>.Shared.Rent(count);
+            return true;
+        }
+
+        // Hands a buffer obtained from TryRentWriteBuffer to the writer task, which returns it to the pool.
+        private void EnqueueWrite(AudioFileTarget target, byte[] rented, int count)
+        {
+            bool added = false;
+            try
+            {
+                // Only fails once the writer has been completed by StopAsync/Dispose
+                added = _writeQueue?.Writer.TryWrite(new AudioWriteJob(target, rented, count)) == true;
+            }
+            finally
+            {
+                if (!added)
+                {
+                    ArrayPool<byte>.Shared.Return(rented);
+                    Interlocked.Decrement(ref _writeQueueDepth);
+                }
             }
         }
 
@@ -595,6 +677,7 @@ namespace Hearbud
             TryDispose(ref _micIn);
             TryDispose(ref _loopSrc);
             TryDispose(ref _micSrc);
+            _micSrcFormat = null;
 
             int maxRetries = 3;
             int retryDelayMs = 250;
@@ -622,6 +705,7 @@ namespace Hearbud
 
                     _loopIn  = new SoundInSource(_loopCap) { FillWithZeros = true };
                     _loopSrc = _loopIn.ToSampleSource();
+                    _loopBlockAlign = _loopIn.WaveFormat.BlockAlign;
 
                     if (micDev != null)
                     {
@@ -632,6 +716,14 @@ namespace Hearbud
                         _micSrc = _micIn.ToSampleSource();
 
                         lock (_micRingLock) { _micR = _micW = _micCount = 0; }
+                        _micResamplePos = 0.0;
+                        _micResampleHasPrev = false;
+                        _micBlockAlign = _micIn.WaveFormat.BlockAlign;
+                        _micSrcFormat = _micSrc.WaveFormat;
+                        _micPassthrough = _micSrcFormat.SampleRate == _outRate
+                                       && _micSrcFormat.Channels == _outChannels;
+                        _micMaxBacklogSamples = (int)(_outRate * MaxMicBacklogSec) * _outChannels;
+                        _micBacklogTargetSamples = (int)(_outRate * MicBacklogTargetSec) * _outChannels;
                     }
                     else
                     {
@@ -686,42 +778,73 @@ namespace Hearbud
         // AUDIO CALLBACKS
         // ==========================================
 
+        // CSCore runs each capture on its own managed thread at AboveNormal priority. Raising it once per
+        // thread keeps UI and encoder load from delaying the callbacks long enough to overrun WASAPI.
+        // The thread is also registered with MMCSS as "Pro Audio" (as low-latency WASAPI clients do), which
+        // the scheduler boosts above normal-class threads; the registration ends when the thread exits.
+        [ThreadStatic] private static bool t_captureThreadBoosted;
+
+        [DllImport("avrt.dll", CharSet = CharSet.Unicode)]
+        private static extern IntPtr AvSetMmThreadCharacteristics(string taskName, ref uint taskIndex);
+
+        private static void BoostCaptureThread()
+        {
+            if (t_captureThreadBoosted) return;
+            t_captureThreadBoosted = true;
+            try { Thread.CurrentThread.Priority = ThreadPriority.Highest; } catch { }
+            try
+            {
+                uint taskIndex = 0;
+                AvSetMmThreadCharacteristics("Pro Audio", ref taskIndex);
+            }
+            catch { /* avrt unavailable: the managed priority above still applies */ }
+        }
+
         private void OnMicData(object? sender, DataAvailableEventArgs e)
         {
-            if (_micSrc == null || _micIn == null || _micCap == null) return;
+            var micFmt = _micSrcFormat;
+            if (_micSrc == null || _micIn == null || _micCap == null || micFmt == null) return;
             try
             {
-                int blockAlignBytes = _micIn.WaveFormat.BlockAlign; 
+                BoostCaptureThread();
+
+                int blockAlignBytes = _micBlockAlign;
                 if (blockAlignBytes <= 0) return;
 
                 int framesAvail = e.ByteCount / blockAlignBytes;
                 if (framesAvail <= 0) return;
 
-                int floatSamplesToRead = framesAvail * _micSrc.WaveFormat.Channels;
-                EnsureCapacity(ref _micInBuf, floatSamplesToRead);
+                int floatSamplesToRead = framesAvail * micFmt.Channels;
+
+                int conv;
+                if (_micPassthrough)
+                {
+                    // Common case (e.g. 48 kHz stereo mic + 48 kHz stereo output): no conversion copy
+                    EnsureCapacity(ref _micConvBuf, floatSamplesToRead);
+                    conv = ReadExactSamples(_micSrc, _micConvBuf, floatSamplesToRead);
+                    if (conv <= 0) return;
+                }
+                else
+                {
+                    EnsureCapacity(ref _micInBuf, floatSamplesToRead);
 
-                int got = ReadExactSamples(_micSrc, _micInBuf, floatSamplesToRead);
-                if (got <= 0) return;
+                    int got = ReadExactSamples(_micSrc, _micInBuf, floatSamplesToRead);
+                    if (got <= 0) return;
 
-                // Optimization: Pass scratch buffer to avoid allocations inside ConvertToTarget
-                int conv = ConvertToTarget(_micInBuf, got, _micSrc.WaveFormat, _outRate, _outChannels, ref _micConvBuf, ref _resampleScratch);
+                    conv = ConvertToTarget(_micInBuf, got, micFmt, _outRate, _outChannels,
+                        ref _micConvBuf, ref _micResamplePos, ref _micResamplePrev, ref _micResampleHasPrev);
+                }
 
                 long nowTicksA = Stopwatch.GetTimestamp();
                 double msSinceLoop = (nowTicksA - _lastLoopTick) * _tickMs;
                 bool loopSilent = msSinceLoop > LoopSilentMsThreshold;
 
                 // --- Metering ---
-                float blockPeak = 0f;
-                double blockRmsSum = 0.0;
-                bool blockClipped = false;
-                for (int i = 0; i < conv; i++)
-                {
-                    float sample = (float)(_micConvBuf[i] * MicGain);
-                    float abs = MathF.Abs(sample);
-                    if (abs > blockPeak) blockPeak = abs;
-                    blockRmsSum += (double)abs * abs;
-                    if (abs > 1f) blockClipped = true;
-                }
+                double gain = MicGain;
+                MeasureBlock(_micConvBuf, conv, out float rawPeak, out double rawSumSq);
+                float blockPeak = (float)(rawPeak * gain);
+                double blockRmsSum = rawSumSq * gain * gain;
+                bool blockClipped = blockPeak > 1f;
                 if (blockPeak > _peakSinceLastMic) _peakSinceLastMic = blockPeak;
                 _rmsSumSinceLastMic += blockRmsSum;
                 _rmsCountSinceLastMic += conv;
@@ -753,12 +876,16 @@ namespace Hearbud
                     lock (_micRingLock)
                     {
                         EnsureRingCapacity(conv);
-                        for (int i = 0; i < conv; i++)
+                        RingWrite(_micConvBuf, conv);
+
+                        // Over the cap: drop the oldest samples down to the target, not just to the cap,
+                        // otherwise every later write would trim back to the cap and pin the skew there
+                        if (_micCount > _micMaxBacklogSamples)
                         {
-                            _micRing[_micW] = _micConvBuf[i];
-                            _micW = (_micW + 1) % _micRing.Length;
-                            if (_micCount < _micRing.Length) _micCount++;
-                            else _micR = (_micR + 1) % _micRing.Length;
+                            int drop = _micCount - _micBacklogTargetSamples;
+                            _micR = (_micR + drop) % _micRing.Length;
+                            _micCount -= drop;
+                            _micOverrunBlocks++;
                         }
                     }
                 }
@@ -766,42 +893,26 @@ namespace Hearbud
                 // --- Write Mic WAV (Async) ---
                 if (_recording && _wavMic != null)
                 {
-                    EnsureCapacity(ref _pcm16Mic, conv * 2);
-                    FloatToPcm16(_micConvBuf, _pcm16Mic, conv); 
                     // Queue for background writing instead of blocking here
-                    EnqueueWrite(AudioFileTarget.Mic, _pcm16Mic, conv * 2);
+                    if (TryRentWriteBuffer(conv * 2, out var pcm))
+                    {
+                        FloatToPcm16(_micConvBuf, pcm, conv);
+                        EnqueueWrite(AudioFileTarget.Mic, pcm, conv * 2);
+                    }
                 }
 
                 // --- Mic-Only Drive (if loopback silent) ---
                 if (_recording && _wavMix != null && _wavSys != null && loopSilent)
                 {
                     // Write zeros to System
-                    EnsureCapacity(ref _pcm16Sys, conv * 2);
-                    Array.Clear(_pcm16Sys, 0, conv * 2);
-                    EnqueueWrite(AudioFileTarget.System, _pcm16Sys, conv * 2);
-
-                    // Write Mic to Mix
-                    EnsureCapacity(ref _mixBufF, conv);
-                    for (int i = 0; i < conv; i++)
+                    if (TryRentWriteBuffer(conv * 2, out var zeros))
                     {
-                        float m = (float)(_micConvBuf[i] * MicGain);
-                        float a = m * 0.5f;
-                        a = SoftClipIfNeeded(a);
-                        _mixBufF[i] = a;
+                        Array.Clear(zeros, 0, conv * 2);
+                        EnqueueWrite(AudioFileTarget.System, zeros, conv * 2);
                     }
 
-                    if (_mixUse32Bit)
-                    {
-                        EnsureCapacity(ref _pcm32Mix, conv * 4);
-                        FloatToPcm32(_mixBufF, _pcm32Mix, conv);
-                        EnqueueWrite(AudioFileTarget.Mix, _pcm32Mix, conv * 4);
-                    }
-                    else
-                    {
-                        EnsureCapacity(ref _pcm16Mix, conv * 2);
-                        FloatToPcm16(_mixBufF, _pcm16Mix, conv);
-                        EnqueueWrite(AudioFileTarget.Mix, _pcm16Mix, conv * 2);
-                    }
+                    // Write Mic to Mix
+                    WriteMix(null, 0f, 0f, _micConvBuf, (float)MicGain, rawPeak, conv);
                 }
             }
             catch (CSCore.CoreAudioAPI.CoreAudioAPIException ex) when (ex.HResult == unchecked((int)0x88890004))
@@ -818,9 +929,10 @@ namespace Hearbud
 
             try
             {
+                BoostCaptureThread();
                 _lastLoopTick = Stopwatch.GetTimestamp();
 
-                int bytesPerFrame = _loopIn.WaveFormat.BlockAlign; 
+                int bytesPerFrame = _loopBlockAlign;
                 if (bytesPerFrame <= 0) return;
 
                 int frames = e.ByteCount / bytesPerFrame;
@@ -833,17 +945,11 @@ namespace Hearbud
                 if (gotLoop <= 0) return;
 
                 // --- Metering ---
-                float blockPeak = 0f;
-                double blockRmsSum = 0.0;
-                bool blockClipped = false;
-                for (int i = 0; i < gotLoop; i++)
-                {
-                    float sample = (float)(_loopBufF[i] * LoopGain);
-                    float abs = MathF.Abs(sample);
-                    if (abs > blockPeak) blockPeak = abs;
-                    blockRmsSum += (double)abs * abs;
-                    if (abs > 1f) blockClipped = true;
-                }
+                double gain = LoopGain;
+                MeasureBlock(_loopBufF, gotLoop, out float rawPeak, out double rawSumSq);
+                float blockPeak = (float)(rawPeak * gain);
+                double blockRmsSum = rawSumSq * gain * gain;
+                bool blockClipped = blockPeak > 1f;
                 if (blockPeak > _peakSinceLastSys) _peakSinceLastSys = blockPeak;
                 _rmsSumSinceLastSys += blockRmsSum;
                 _rmsCountSinceLastSys += gotLoop;
@@ -865,70 +971,54 @@ namespace Hearbud
                 // --- Write System WAV (Async) ---
                 if (_recording && _wavSys != null)
                 {
-                    EnsureCapacity(ref _pcm16Sys, gotLoop * 2);
-                    FloatToPcm16(_loopBufF, _pcm16Sys, gotLoop);
-                    EnqueueWrite(AudioFileTarget.System, _pcm16Sys, gotLoop * 2);
+                    if (TryRentWriteBuffer(gotLoop * 2, out var pcm))
+                    {
+                        FloatToPcm16(_loopBufF, pcm, gotLoop);
+                        EnqueueWrite(AudioFileTarget.System, pcm, gotLoop * 2);
+                    }
                 }
 
-                // --- Diagnostics ---
+                // --- Mixing ---
+                // One lock round-trip per block: snapshot the backlog and drain the mic ring together
+                EnsureCapacity(ref _tmpMicBlock, gotLoop);
+                int micRead;
                 int snapshotMicCount;
                 lock (_micRingLock)
                 {
                     snapshotMicCount = _micCount;
+                    micRead = RingRead(_tmpMicBlock, gotLoop);
                 }
+
+                // --- Diagnostics ---
                 double backlogSec = (double)snapshotMicCount / (_outChannels * _outRate);
                 _lastMicBacklogSec = backlogSec;
                 if (backlogSec > _micBacklogSecMax) _micBacklogSecMax = backlogSec;
-
-                // --- Mixing ---
-                EnsureCapacity(ref _tmpMicBlock, gotLoop);
-                int micRead;
-                lock (_micRingLock)
-                {
-                    micRead = Math.Min(gotLoop, _micCount);
-                    for (int i = 0; i < micRead; i++)
-                    {
-                        _tmpMicBlock[i] = _micRing[_micR];
-                        _micR = (_micR + 1) % _micRing.Length;
-                    }
-                    _micCount -= micRead;
-                }
                 if (micRead < gotLoop)
                 {
-                    Array.Clear(_tmpMicBlock, micRead, gotLoop - micRead);
+                    // A fully empty ring is mixed as "no mic" below, so only partial reads need zero-fill
+                    if (micRead > 0) Array.Clear(_tmpMicBlock, micRead, gotLoop - micRead);
                     _micUnderrunBlocks++;
                 }
 
                 _loopBlockCounter++;
-                if (_loopBlockCounter % BacklogLogEveryNBlocks == 0)
+                // The session log only exists while recording; don't format a line nobody will write
+                if (_logQueue != null && _loopBlockCounter % BacklogLogEveryNBlocks == 0)
                 {
                     Info($"Mic ring backlog: {backlogSec:F4} s (max {_micBacklogSecMax:F4} s)");
                 }
 
-                EnsureCapacity(ref _mixBufF, gotLoop);
-                for (int i = 0; i < gotLoop; i++)
-                {
-                    float s = (float)(_loopBufF[i] * LoopGain);
-                    float m = (float)(_tmpMicBlock[i] * MicGain);
-                    float a = (s + m) * 0.5f; 
-                    a = SoftClipIfNeeded(a);
-                    _mixBufF[i] = a;
-                }
-
-                // --- Write Mix WAV (Async) ---
+                // --- Mix + Write Mix WAV (Async) ---
+                // The mix is only ever consumed by the mix WAV, so it is not computed while monitoring.
                 if (_recording && _wavMix != null)
                 {
-                    if (_mixUse32Bit)
+                    if (micRead == 0)
                     {
-                        EnsureCapacity(ref _pcm32Mix, gotLoop * 4);
-                        FloatToPcm32(_mixBufF, _pcm32Mix, gotLoop);
-                        EnqueueWrite(AudioFileTarget.Mix, _pcm32Mix, gotLoop * 4);
+                        WriteMix(_loopBufF, (float)LoopGain, rawPeak, null, 0f, 0f, gotLoop);
                     }
                     else
                     {
-                        EnsureCapacity(ref _pcm16Mix, gotLoop * 2);
-                        FloatToPcm16(_mixBufF, _pcm16Mix, gotLoop); 
-                        EnqueueWrite(AudioFileTarget.Mix, _pcm16Mix, gotLoop * 2);
+                        MeasureBlock(_tmpMicBlock, gotLoop, out float micPeak, out _);
+                        WriteMix(_loopBufF, (float)LoopGain, rawPeak, _tmpMicBlock, (float)MicGain, micPeak, gotLoop);
                     }
                 }
             }
@@ -940,6 +1030,80 @@ namespace Hearbud
             catch (Exception ex) { Error("OnLoopbackData", ex); }
         }
 
+        /// <summary>
+        /// Single SIMD pass computing the absolute peak and the sum of squares of a block.
+        /// Gain is applied by the caller afterwards (peak * g, sumSq * g²), so the block is read once
+        /// and no scaled copy is produced.
+        /// </summary>
+        private static void MeasureBlock(float[] buf, int count, out float peak, out double sumSq)
+        {
+            var span = buf.AsSpan(0, count);
+            int i = 0;
+            float p = 0f;
+            double sum = 0.0;
+
+            if (Vector.IsHardwareAccelerated && count >= Vector<float>.Count)
+            {
+                var vMax = Vector<float>.Zero;
+                var vSum = Vector<float>.Zero;
+                var vecs = MemoryMarshal.Cast<float, Vector<float>>(span);
+                foreach (var v in vecs)
+                {
+                    vMax = Vector.Max(vMax, Vector.Abs(v));
+                    vSum += v * v;
+                }
+                for (int k = 0; k < Vector<float>.Count; k++)
+                {
+                    if (vMax[k] > p) p = vMax[k];
+                    sum += vSum[k];
+                }
+                i = vecs.Length * Vector<float>.Count;
+            }
+
+            for (; i < count; i++)
+            {
+                float abs = MathF.Abs(span[i]);
+                if (abs > p) p = abs;
+                sum += (double)abs * abs;
+            }
+
+            peak = p;
+            sumSq = sum;
+        }
+
+        // Mixes 'count' samples of loopback + mic and queues the result for the mix WAV. In 32-bit mode
+        // (the default) the gain, average, soft clip and PCM quantization are done in a single pass straight
+        // into the output bytes. Either source may be null (mic-only drive, or an empty mic ring), in which
+        // case it contributes silence without being read. loopPeak/micPeak are the blocks' raw absolute
+        // peaks, used to skip the soft clip when it could not change any sample.
+        private void WriteMix(float[]? loop, float loopGain, float loopPeak, float[]? mic, float micGain, float micPeak, int count)
+        {
+            float peakBound = (loopPeak * loopGain + micPeak * micGain) * 0.5f;
+            bool softClip = peakBound >= SoftClipLinearBelow;
+
+            if (_mixUse32Bit)
+            {
+                if (!TryRentWriteBuffer(count * 4, out var pcm)) return;
+                MixToPcm32(loop, loopGain, mic, micGain, softClip, pcm, count);
+                EnqueueWrite(AudioFileTarget.Mix, pcm, count * 4);
+            }
+            else
+            {
+                EnsureCapacity(ref _mixBufF, count);
+                float lg = loopGain * 0.5f, mg = micGain * 0.5f;
+                for (int i = 0; i < count; i++)
+                {
+                    float a = 0f;
+                    if (loop != null) a += loop[i] * lg;
+                    if (mic != null) a += mic[i] * mg;
+                    _mixBufF[i] = softClip ? SoftClipIfNeeded(a) : a;
+                }
+                if (!TryRentWriteBuffer(count * 2, out var pcm)) return;
+                FloatToPcm16(_mixBufF, pcm, count);
+                EnqueueWrite(AudioFileTarget.Mix, pcm, count * 2);
+            }
+        }
+
         private static int ReadExactSamples(ISampleSource src, float[] dst, int count)
         {
             int total = 0;
@@ -956,11 +1120,18 @@ namespace Hearbud
         // DSP & CONVERSION
         // ==========================================
 
-        // Modified: Now takes 'ref scratch' to avoid "new float[]" allocations in the loop
+        // Resamples (linear) and remaps channels in a single pass straight into 'dst'.
+        // Mono sources are duplicated per output channel as they are written, so no intermediate
+        // resampled or up-mixed copy is ever materialized.
+        //
+        // The resampler is stateful across blocks: 'pos' carries the fractional read position (relative
+        // to the next block's first frame, so it may be negative) and 'prev' holds the previous block's
+        // last frame. Interpolation therefore continues seamlessly over block boundaries, and no
+        // fractional output frames are lost per block (which would slowly starve the mic ring).
         private static int ConvertToTarget(
             float[] src, int floatCount, CSCore.WaveFormat srcFmt,
             int dstRate, int dstCh, 
-            ref float[] dst, ref float[] scratch)
+            ref float[] dst, ref double pos, ref float[] prev, ref bool hasPrev)
         {
             int srcCh = srcFmt.Channels;
             int srcRate = srcFmt.SampleRate;
@@ -968,75 +1139,90 @@ namespace Hearbud
             int srcFrames = floatCount / srcCh;
             if (srcFrames <= 0) return 0;
 
-            int dstFrames = (srcRate == dstRate) ? srcFrames
-                          : (int)((long)srcFrames * dstRate / srcRate);
-
-            EnsureCapacity(ref dst, Math.Max(dstCh, srcCh) * dstFrames);
-
-            // Optimization: Reuse existing buffers instead of creating 'temp'
-            // If no resample needed, we point temp to src.
-            // If resample needed, we use the scratch buffer provided by the caller.
-            float[] temp = src;
-            int tempFrames = srcFrames;
-
-            if (srcRate != dstRate)
+            int di = 0;
+            if (srcRate == dstRate)
             {
-                EnsureCapacity(ref scratch, srcCh * dstFrames);
-                temp = scratch;
+                EnsureCapacity(ref dst, Math.Max(dstCh, srcCh) * srcFrames);
 
-                float ratio = (float)srcRate / dstRate;
-                int di = 0;
-                for (int f = 0; f < dstFrames; f++)
+                if (srcCh == dstCh)
                 {
-                    float sp = f * ratio;
-                    int i0 = (int)sp;
-                    int i1 = Math.Min(i0 + 1, srcFrames - 1);
-                    float t = sp - i0;
+                    Array.Copy(src, 0, dst, 0, srcFrames * srcCh);
+                    return srcFrames * srcCh;
+                }
 
-                    for (int c = 0; c < srcCh; c++)
+                // The channel layout is fixed for the block, so pick the mapping once rather than per frame
+                int srcEnd = srcFrames * srcCh;
+                if (dstCh == 1)
+                {
+                    // Downmix: average the first two channels
+                    for (int si = 0; si < srcEnd; si += srcCh)
+                        dst[di++] = 0.5f * (src[si] + src[si + 1]);
+                }
+                else if (srcCh == 1)
+                {
+                    // Upmix: duplicate mono to every output channel
+                    for (int si = 0; si < srcEnd; si++)
                     {
-                        float s0 = src[i0 * srcCh + c];
-                        float s1 = src[i1 * srcCh + c];
-                        temp[di++] = s0 + (s1 - s0) * t;
+                        float v = src[si];
+                        for (int c = 0; c < dstCh; c++) dst[di++] = v;
                     }
                 }
-                tempFrames = dstFrames;
+                else
+                {
+                    for (int si = 0; si < srcEnd; si += srcCh)
+                    {
+                        for (int c = 0; c < dstCh; c++)
+                            dst[di++] = src[si + Math.Min(c, srcCh - 1)];
+                    }
+                }
+                return di;
             }
 
-            int di2 = 0;
-            if (srcCh == dstCh)
-            {
-                Array.Copy(temp, 0, dst, 0, tempFrames * srcCh);
-                di2 = tempFrames * srcCh;
-            }
-            else if (srcCh == 1 && dstCh == 2)
+            double step = (double)srcRate / dstRate;
+            int maxFrames = (int)((srcFrames + 1) / step) + 2;
+            EnsureCapacity(ref dst, Math.Max(dstCh, srcCh) * maxFrames);
+            EnsureCapacity(ref prev, srcCh);
+
+            double p = hasPrev ? pos : 0.0;
+            int lastFrame = srcFrames - 1;
+            while (p < lastFrame)
             {
-                for (int f = 0; f < tempFrames; f++)
+                int i0 = (int)Math.Floor(p);
+                float t = (float)(p - i0);
+
+                // Frame -1 is the previous block's last frame
+                float[] a = i0 < 0 ? prev : src;
+                int b0 = i0 < 0 ? 0 : i0 * srcCh;
+                int b1 = (i0 + 1) * srcCh;
+
+                if (srcCh == 1)
                 {
-                    float m = temp[f];
-                    dst[di2++] = m; dst[di2++] = m;
+                    float m = a[b0] + (src[b1] - a[b0]) * t;
+                    for (int c = 0; c < dstCh; c++) dst[di++] = m;
                 }
-            }
-            else if (srcCh >= 2 && dstCh == 1)
-            {
-                for (int f = 0; f < tempFrames; f++)
+                else if (dstCh == 1)
                 {
-                    float l = temp[f * srcCh + 0];
-                    float r = temp[f * srcCh + 1];
-                    dst[di2++] = 0.5f * (l + r);
+                    float l = a[b0]     + (src[b1]     - a[b0])     * t;
+                    float r = a[b0 + 1] + (src[b1 + 1] - a[b0 + 1]) * t;
+                    dst[di++] = 0.5f * (l + r);
                 }
-            }
-            else
-            {
-                for (int f = 0; f < tempFrames; f++)
+                else
                 {
-                    int si = f * srcCh;
                     for (int c = 0; c < dstCh; c++)
-                        dst[di2++] = temp[si + Math.Min(c, srcCh - 1)];
+                    {
+                        int sc = Math.Min(c, srcCh - 1);
+                        dst[di++] = a[b0 + sc] + (src[b1 + sc] - a[b0 + sc]) * t;
+                    }
                 }
+
+                p += step;
             }
 
-            return di2;
+            pos = p - srcFrames;
+            Array.Copy(src, lastFrame * srcCh, prev, 0, srcCh);
+            hasPrev = true;
+
+            return di;
         }
 
         private static float SoftClipIfNeeded(float x)
@@ -1046,56 +1232,65 @@ namespace Hearbud
             return MathF.Tanh(x);
         }
 
+        // Unseeded: .NET picks a random seed per instance and uses the xoshiro256** generator. An explicit
+        // seed would select the legacy compat algorithm, which is several times slower per draw and
+        // the dither draws two values for every sample written.
         private static readonly ThreadLocal<Random> _rng =
-            new ThreadLocal<Random>(() => new Random(
-                HashCode.Combine(
-                    Environment.TickCount64,
-                    Thread.CurrentThread.ManagedThreadId,
-                    Guid.NewGuid().GetHashCode())));
+            new ThreadLocal<Random>(() => new Random());
 
         private static void FloatToPcm16(float[] src, byte[] dst, int count)
         {
-            int j = 0;
+            // Write samples straight into the byte buffer as little-endian shorts (all Windows targets are LE)
+            var outS = MemoryMarshal.Cast<byte, short>(dst.AsSpan(0, count * 2));
             var rng = _rng.Value!;
             for (int i = 0; i < count; i++)
-            {
-                float v = src[i];
-                if (v > 1f) v = 1f; else if (v < -1f) v = -1f;
+                outS[i] = DitherToPcm16(src[i], rng);
+        }
 
-                float scaled = v * 32767.0f;
-                float dither = (float)rng.NextDouble() - (float)rng.NextDouble();
-                float withDither = scaled + dither; 
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        private static short DitherToPcm16(float v, Random rng)
+        {
+            v = Math.Clamp(v, -1f, 1f);
 
-                int s = (int)MathF.Round(withDither);
-                if (s > short.MaxValue) s = short.MaxValue;
-                else if (s < short.MinValue) s = short.MinValue;
+            // TPDF dither in [-1, 1) LSB; NextSingle avoids two double draws + casts per sample
+            float dither = rng.NextSingle() - rng.NextSingle();
 
-                dst[j++] = (byte)(s & 0xFF);
-                dst[j++] = (byte)((s >> 8) & 0xFF);
-            }
+            int s = (int)MathF.Round(v * 32767.0f + dither);
+            return (short)Math.Clamp(s, short.MinValue, short.MaxValue);
         }
 
         /// <summary>
-        /// Converts float samples to 32-bit PCM bytes.
-        /// Uses long for intermediate calculation to avoid overflow on loud signals.
+        /// Fused mix kernel: (loop * loopGain + mic * micGain) * 0.5, tanh soft clip (unless the caller
+        /// knows the block is below SoftClipLinearBelow), then 32-bit PCM.
+        /// Reads each input once and writes the output bytes directly, with no intermediate float buffer.
         /// </summary>
-        private static void FloatToPcm32(float[] src, byte[] dst, int count)
+        private static void MixToPcm32(float[]? loop, float loopGain, float[]? mic, float micGain, bool softClip, byte[] dst, int count)
         {
-            int j = 0;
-            for (int i = 0; i < count; i++)
+            // WAV data is little-endian, as are all Windows targets (x64/ARM64)
+            var outS = MemoryMarshal.Cast<byte, int>(dst.AsSpan(0, count * 4));
+            float lg = loopGain * 0.5f, mg = micGain * 0.5f;
+
+            if (loop != null && mic != null)
+            {
+                for (int i = 0; i < count; i++)
+                {
+                    // tanh (or the linear-range check) keeps the result within [-1, 1], so no clamp is needed
+                    float a = loop[i] * lg + mic[i] * mg;
+                    if (softClip) a = SoftClipIfNeeded(a);
+                    outS[i] = (int)Math.Round(a * 2147483647.0);
+                }
+            }
+            else
             {
-                float v = src[i];
-                if (v > 1f) v = 1f; else if (v < -1f) v = -1f;
-                
-                // Use long for intermediate calculation to avoid overflow
-                long scaled = (long)Math.Round(v * 2147483647.0);
-                scaled = Math.Clamp(scaled, int.MinValue, int.MaxValue);
-                int s = (int)scaled;
-                
-                dst[j++] = (byte)(s & 0xFF);
-                dst[j++] = (byte)((s >> 8) & 0xFF);
-                dst[j++] = (byte)((s >> 16) & 0xFF);
-                dst[j++] = (byte)((s >> 24) & 0xFF);
+                // Single-source drive (mic-only while loopback is silent, or loopback while the mic ring is empty)
+                float[] src = loop ?? mic!;
+                float g = loop != null ? lg : mg;
+                for (int i = 0; i < count; i++)
+                {
+                    float a = src[i] * g;
+                    if (softClip) a = SoftClipIfNeeded(a);
+                    outS[i] = (int)Math.Round(a * 2147483647.0);
+                }
             }
         }
 
@@ -1104,11 +1299,6 @@ namespace Hearbud
             if (buf == null) buf = new float[NextPow2(needed)];
             else if (buf.Length < needed) Array.Resize(ref buf, NextPow2(needed));
         }
-        private static void EnsureCapacity(ref byte[] buf, int needed)
-        {
-            if (buf == null) buf = new byte[NextPow2(needed)];
-            else if (buf.Length < needed) Array.Resize(ref buf, NextPow2(needed));
-        }
         private static int NextPow2(int n)
         {
             if (n <= 256) return 256;
@@ -1123,14 +1313,62 @@ namespace Hearbud
             if (newLen <= _micRing.Length) return;
 
             var newBuf = new float[newLen];
-            for (int i = 0; i < _micCount; i++)
-                newBuf[i] = _micRing[(_micR + i) % _micRing.Length];
+            int first = Math.Min(_micCount, _micRing.Length - _micR);
+            Array.Copy(_micRing, _micR, newBuf, 0, first);
+            if (_micCount > first) Array.Copy(_micRing, 0, newBuf, first, _micCount - first);
 
             _micRing = newBuf;
             _micR = 0;
             _micW = _micCount;
         }
 
+        // Copies 'count' samples into the mic ring using at most two block copies (one per side of the
+        // wrap point) instead of a per-sample modulo loop. Caller must hold _micRingLock.
+        // If the ring is full, the oldest samples are overwritten.
+        private void RingWrite(float[] src, int count)
+        {
+            int len = _micRing.Length;
+            int srcOff = 0;
+            if (count > len)
+            {
+                // Only the newest 'len' samples can survive anyway
+                srcOff = count - len;
+                count = len;
+            }
+
+            int first = Math.Min(count, len - _micW);
+            Array.Copy(src, srcOff, _micRing, _micW, first);
+            if (count > first) Array.Copy(src, srcOff + first, _micRing, 0, count - first);
+            _micW = (_micW + count) % len;
+
+            int overflow = _micCount + count - len;
+            if (overflow > 0)
+            {
+                _micR = (_micR + overflow) % len;
+                _micCount = len;
+            }
+            else
+            {
+                _micCount += count;
+            }
+        }
+
+        // Copies up to 'count' samples out of the mic ring into 'dst' and returns the number copied.
+        // Caller must hold _micRingLock.
+        private int RingRead(float[] dst, int count)
+        {
+            int n = Math.Min(count, _micCount);
+            if (n <= 0) return 0;
+
+            int len = _micRing.Length;
+            int first = Math.Min(n, len - _micR);
+            Array.Copy(_micRing, _micR, dst, 0, first);
+            if (n > first) Array.Copy(_micRing, 0, dst, first, n - first);
+            _micR = (_micR + n) % len;
+            _micCount -= n;
+            return n;
+        }
+
         private void OpenLog()
         {
             try
@@ -1138,15 +1376,49 @@ namespace Hearbud
                 _logBytesWritten = 0;
                 if (!string.IsNullOrEmpty(_logPath))
                 {
-                    TryDispose(ref _log);
+                    CloseLog();
                     Directory.CreateDirectory(Path.GetDirectoryName(_logPath)!);
-                    _log = new StreamWriter(new FileStream(_logPath, FileMode.Append, FileAccess.Write, FileShare.Read))
-                    { AutoFlush = true };
+                    _log = new StreamWriter(new FileStream(_logPath, FileMode.Append, FileAccess.Write, FileShare.Read));
+                    _logQueue = Channel.CreateUnbounded<string>(
+                        new UnboundedChannelOptions { SingleReader = true, SingleWriter = false });
+                    var reader = _logQueue.Reader;
+                    var log = _log;
+                    _logTask = Task.Run(() => LogWriteLoop(reader, log));
                     Info($"Log path: {_logPath}");
                 }
             }
             catch { }
         }
+
+        // Drains queued log lines and flushes once per batch, so the file is current whenever the
+        // queue is idle without paying a flush per line.
+        private static async Task LogWriteLoop(ChannelReader<string> reader, StreamWriter log)
+        {
+            try
+            {
+                while (await reader.WaitToReadAsync().ConfigureAwait(false))
+                {
+                    while (reader.TryRead(out var line))
+                        log.WriteLine(line);
+                    log.Flush();
+                }
+            }
+            catch { }
+        }
+
+        // Completes the log queue, waits briefly for pending lines to be written, and closes the file.
+        private void CloseLog()
+        {
+            var queue = _logQueue;
+            _logQueue = null;
+            if (queue != null)
+            {
+                queue.Writer.TryComplete();
+                try { _logTask?.Wait(1000); } catch { }
+            }
+            _logTask = null;
+            TryDispose(ref _log);
+        }
         private void Info(string msg)  => WriteLog("INFO",  msg);
         private void Warn(string msg)  => WriteLog("WARN",  msg);
         private void Error(string where, Exception ex) => WriteLog("ERROR", $"{where}: {ex}");
@@ -1157,19 +1429,21 @@ namespace Hearbud
             {
                 lock (_logLock)
                 {
-                    if (_log == null) return;
+                    var queue = _logQueue;
+                    if (queue == null) return;
 
                     var line = $"[{DateTime.Now:yyyy-MM-dd HH:mm:ss.fff}] {level} {where}: {msg}";
                     _logBytesWritten += line.Length * 2; // Rough estimate
 
                     if (_logBytesWritten > MaxLogSizeBytes)
                     {
-                        _log.WriteLine("[LOG TRUNCATED - Maximum size reached]");
-                        TryDispose(ref _log);
+                        // Completing the queue stops further lines; the file is closed by CloseLog
+                        if (queue.Writer.TryWrite("[LOG TRUNCATED - Maximum size reached]"))
+                            queue.Writer.TryComplete();
                         return;
                     }
 
-                    _log.WriteLine(line);
+                    queue.Writer.TryWrite(line);
                 }
                 Debug.WriteLine($"{level} {where}: {msg}");
             }
@@ -1201,6 +1475,13 @@ namespace Hearbud
             => Status?.Invoke(this, new EngineStatusEventArgs(
                 kind, message, success, outputPathSystem, outputPathMic, outputPathMix, outputPathMp3));
 
+        // A single FileInfo stat answers both "exists" and "has data" (FileInfo caches the attributes)
+        private static bool IsNonEmptyFile(string path)
+        {
+            var fi = new FileInfo(path);
+            return fi.Exists && fi.Length > 0;
+        }
+
         private static string UniquePath(string path)
         {
             try